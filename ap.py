@@ -2,7 +2,6 @@ import streamlit as st
 import requests
 import pandas as pd
 import numpy as np
-import plotly.express as px
 import folium
 from streamlit_folium import st_folium
 from sklearn.linear_model import LinearRegression
@@ -10,6 +9,7 @@ from io import BytesIO
 import base64
 from datetime import datetime as dt
 from datetime import datetime
+from datetime import timedelta
 UPLOAD_DIR = "uploads"
 LAPORAN_FILE = "laporan_warga.json"
 import pytz
@@ -18,6 +18,12 @@ import json
 import os
 from PIL import Image
 from rapidfuzz import process, fuzz
+from grafik import figur
+from model_panen import (
+    RIWAYAT_PANEN_FILE, daftar_snapshot, evaluasi_banyak, info_riwayat,
+    latih_dari_upload, latih_ulang_riwayat, muat_snapshot, prediksi_panen,
+    simpan_snapshot
+)
 
 # ------------------ KONFIGURASI AWAL ------------------
 st.set_page_config(
@@ -111,10 +117,12 @@ df_jam = pd.DataFrame({
 
 # ------------------ TAMPILKAN GRAFIK ------------------
 with st.expander("Grafik Harian"):
-    st.plotly_chart(px.bar(df_harian, x="Tanggal", y="Curah Hujan (mm)", title="Curah Hujan Harian"), use_container_width=True)
-    st.plotly_chart(px.line(df_harian, x="Tanggal", y="Suhu Maks (°C)", title="Suhu Maksimum Harian"), use_container_width=True)
-    st.plotly_chart(px.line(df_harian, x="Tanggal", y="Suhu Min (°C)", title="Suhu Minimum Harian"), use_container_width=True)
-    st.plotly_chart(px.line(df_harian, x="Tanggal", y="Kelembapan (%)", title="Kelembapan Harian"), use_container_width=True)
+    st.plotly_chart(figur(
+        df_harian, "Tanggal",
+        [("Curah Hujan (mm)", "bar"), ("Suhu Maks (°C)", "line"),
+         ("Suhu Min (°C)", "line"), ("Kelembapan (%)", "line")],
+        judul="Cuaca Harian"
+    ), use_container_width=True)
 
 from datetime import datetime as dt
 
@@ -124,9 +132,26 @@ with st.expander("Grafik Per Jam (48 Jam Ke Depan)"):
     if df_jam_prediksi.empty:
         st.warning("Tidak ada data prediksi ke depan tersedia saat ini.")
     else:
-        st.plotly_chart(px.line(df_jam_prediksi, x="Waktu", y="Curah Hujan (mm)", title="Prediksi Curah Hujan per Jam (48 Jam Ke Depan)"), use_container_width=True)
-        st.plotly_chart(px.line(df_jam_prediksi, x="Waktu", y="Suhu (°C)", title="Prediksi Suhu per Jam (48 Jam Ke Depan)"), use_container_width=True)
-        st.plotly_chart(px.line(df_jam_prediksi, x="Waktu", y="Kelembapan (%)", title="Prediksi Kelembapan per Jam (48 Jam Ke Depan)"), use_container_width=True)
+        waktu_awal = df_jam_prediksi["Waktu"].min().to_pydatetime()
+        waktu_akhir = df_jam_prediksi["Waktu"].max().to_pydatetime()
+        rentang_jam = (waktu_awal, waktu_akhir)
+        if waktu_awal < waktu_akhir:
+            # Jendela 48 jam bergeser tiap jam, jadi zoom tersimpan dipotong ke rentang baru
+            zoom_lama = st.session_state.get("zoom_jam")
+            if zoom_lama is not None:
+                zoom_lama = (max(zoom_lama[0], waktu_awal), min(zoom_lama[1], waktu_akhir))
+            if zoom_lama is None or zoom_lama[0] >= zoom_lama[1]:
+                zoom_lama = (waktu_awal, waktu_akhir)
+            st.session_state.zoom_jam = zoom_lama
+            rentang_jam = st.slider(
+                "Rentang Waktu", min_value=waktu_awal, max_value=waktu_akhir,
+                step=timedelta(hours=1), format="DD/MM HH:mm", key="zoom_jam"
+            )
+        st.plotly_chart(figur(
+            df_jam_prediksi, "Waktu",
+            [("Curah Hujan (mm)", "line"), ("Suhu (°C)", "line"), ("Kelembapan (%)", "line")],
+            judul="Prediksi Cuaca per Jam (48 Jam Ke Depan)", rentang=rentang_jam
+        ), use_container_width=True)
 
 # ------------------ MODEL PREDIKSI ------------------
 model_df = pd.DataFrame({
@@ -139,15 +164,89 @@ model = LinearRegression().fit(
     model_df.drop("Hasil Panen (kg/ha)", axis=1), model_df["Hasil Panen (kg/ha)"]
 )
 
-if not df_harian.empty:
-    input_now = df_harian[["Curah Hujan (mm)", "Suhu Maks (°C)", "Kelembapan (%)"]].mean().values.reshape(1, -1)
-    hasil = model.predict(input_now)[0]
-else:
-    hasil = 0
+KOLOM_CUACA = ["Curah Hujan (mm)", "Suhu Maks (°C)", "Kelembapan (%)"]
+
+# Rata-rata cuaca dihitung sekali per rerun lalu dipakai semua prediksi
+input_auto = df_harian[KOLOM_CUACA].mean().values.reshape(1, -1) if not df_harian.empty else None
+# Gunakan data 7 hari pertama untuk panen 1
+df_panen1 = df_harian.head(7)
+input_panen1 = df_panen1[KOLOM_CUACA].mean().values.reshape(1, -1)
+# Gunakan data hari ke-8 sampai ke-14 untuk panen 2 (anggap beda musim)
+df_panen2 = df_harian[7:14] if len(df_harian) >= 14 else df_harian.tail(7)
+input_panen2 = df_panen2[KOLOM_CUACA].mean().values.reshape(1, -1)
+
+# Snapshot tidak pernah diubah setelah disimpan, jadi aman di-cache per versi
+@st.cache_resource
+def muat_model_panen(versi):
+    return muat_snapshot(versi)
+
+# Semua versi dinilai ulang pada data uji riwayat yang sama; cache diperbarui
+# setiap kali riwayat berubah (ukuran/waktu ubah file)
+@st.cache_data(show_spinner=False)
+def metrik_terkini(versi_semua, ukuran_riwayat, waktu_riwayat):
+    return evaluasi_banyak([muat_model_panen(v) for v in versi_semua], RIWAYAT_PANEN_FILE)
 
 # ------------------ PREDIKSI PANEN (Manual + Otomatis) ------------------
 with st.expander("Prediksi Panen"):
 
+    # Model dari catatan panen warga
+    st.subheader("Model Prediksi")
+    file_panen = st.file_uploader(
+        "Upload Catatan Panen (CSV: Curah Hujan (mm), Suhu (°C), Kelembapan (%), Hasil Panen (kg/ha))",
+        type=["csv"], key="csv_panen"
+    )
+    col_latih, col_ulang = st.columns(2)
+    if col_latih.button("Latih dengan CSV"):
+        if file_panen is None:
+            st.warning("Upload file CSV catatan panen terlebih dahulu.")
+        else:
+            try:
+                daftar_model = daftar_snapshot()
+                dasar = muat_model_panen(daftar_model[-1]["Versi"]) if daftar_model else None
+                with st.spinner("Melatih model..."):
+                    snapshot = latih_dari_upload(file_panen, dasar)
+                versi_baru = simpan_snapshot(snapshot, file_panen.name)
+                st.success(f"Model v{versi_baru} berhasil disimpan.")
+            except ValueError as e:
+                st.warning(str(e))
+    if col_ulang.button("Latih Ulang dari Riwayat"):
+        try:
+            with st.spinner("Melatih ulang model dari riwayat..."):
+                snapshot = latih_ulang_riwayat()
+            versi_baru = simpan_snapshot(snapshot, "Riwayat Panen")
+            st.success(f"Model v{versi_baru} berhasil disimpan.")
+        except ValueError as e:
+            st.warning(str(e))
+
+    daftar_model = daftar_snapshot()
+    versi_model = st.selectbox(
+        "Versi Model", [0] + [d["Versi"] for d in daftar_model], index=len(daftar_model),
+        format_func=lambda v: "Bawaan (data contoh)" if v == 0 else f"v{v}", key="versi_model"
+    )
+    if daftar_model:
+        info = info_riwayat()
+        if info is not None:
+            metrik = metrik_terkini(tuple(d["Versi"] for d in daftar_model), *info)
+            st.dataframe(
+                pd.DataFrame([{**d, **m} for d, m in zip(daftar_model, metrik)]),
+                use_container_width=True
+            )
+            st.caption(
+                f"MAE/RMSE semua versi dihitung ulang pada data uji riwayat panen "
+                f"saat ini ({metrik[0]['Data Uji']} baris), jadi bisa dibandingkan langsung."
+            )
+        else:
+            st.dataframe(pd.DataFrame(daftar_model), use_container_width=True)
+            st.caption(
+                "Riwayat panen tidak ditemukan. Metrik adalah nilai saat model disimpan "
+                "dan data ujinya bisa berbeda antar versi (lihat kolom Data Uji)."
+            )
+
+    def prediksi(X):
+        if versi_model == 0:
+            return model.predict(X)
+        return prediksi_panen(muat_model_panen(versi_model), X)
+
     # Input manual
     st.subheader("Input Manual")
     ch_manual = st.number_input("Curah Hujan (mm)", value=5.0, key="manual_ch")
@@ -156,7 +255,7 @@ with st.expander("Prediksi Panen"):
     luas_manual = st.number_input("Luas Lahan (ha)", value=1.0, key="manual_luas")
     harga_manual = st.number_input("Harga Gabah (Rp/kg)", value=6500, key="manual_harga")
 
-    pred_manual = model.predict([[ch_manual, suhu_manual, hum_manual]])[0]
+    pred_manual = prediksi([[ch_manual, suhu_manual, hum_manual]])[0]
     total_manual = pred_manual * luas_manual
     pendapatan_manual = total_manual * harga_manual
 
@@ -165,9 +264,8 @@ with st.expander("Prediksi Panen"):
     luas_auto = st.number_input("Luas Sawah (ha) (otomatis)", value=1.0, key="auto_luas")
     harga_auto = st.number_input("Harga Gabah (Rp/kg) (otomatis)", value=6500, key="auto_harga")
 
-    if not df_harian.empty:
-        input_auto = df_harian[["Curah Hujan (mm)", "Suhu Maks (°C)", "Kelembapan (%)"]].mean().values.reshape(1, -1)
-        pred_auto = model.predict(input_auto)[0]
+    if input_auto is not None:
+        pred_auto = prediksi(input_auto)[0]
     else:
         pred_auto = 0
     total_auto = pred_auto * luas_auto
@@ -176,15 +274,8 @@ with st.expander("Prediksi Panen"):
     # Proyeksi Panen Tahunan Otomatis (2 Kali Panen)
     st.markdown("Proyeksi Panen Tahunan")
 
-    # Gunakan data 7 hari pertama untuk panen 1
-    df_panen1 = df_harian.head(7)
-    input_panen1 = df_panen1[["Curah Hujan (mm)", "Suhu Maks (°C)", "Kelembapan (%)"]].mean().values.reshape(1, -1)
-    pred1 = model.predict(input_panen1)[0]
-
-    # Gunakan data hari ke-8 sampai ke-14 untuk panen 2 (anggap beda musim)
-    df_panen2 = df_harian[7:14] if len(df_harian) >= 14 else df_harian.tail(7)
-    input_panen2 = df_panen2[["Curah Hujan (mm)", "Suhu Maks (°C)", "Kelembapan (%)"]].mean().values.reshape(1, -1)
-    pred2 = model.predict(input_panen2)[0]
+    pred1 = prediksi(input_panen1)[0]
+    pred2 = prediksi(input_panen2)[0]
 
     # Input luas & harga
     luas_ha = st.number_input("Luas Lahan (ha)", value=1.0, key="luas_tahunan")
@@ -0,0 +1,53 @@
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io
+import plotly.tools
+
+from grafik import _figur_tersimpan, buat_figur, figur
+
+# ------------------ DATA SINTETIS ------------------
+# Riwayat per jam beberapa bulan, setara dengan data Open-Meteo yang dikumpulkan
+HARI = 180
+waktu = pd.date_range("2025-01-01", periods=HARI * 24, freq="h")
+rng = np.random.default_rng(0)
+df_jam = pd.DataFrame({
+    "Waktu": waktu,
+    "Curah Hujan (mm)": np.round(rng.gamma(0.4, 2.0, len(waktu)), 1),
+    "Suhu (°C)": np.round(28 + 4 * np.sin(np.arange(len(waktu)) / 24 * 2 * np.pi) + rng.normal(0, 0.8, len(waktu)), 1),
+    "Kelembapan (%)": np.round(np.clip(80 + rng.normal(0, 6, len(waktu)), 40, 100), 1),
+})
+PANEL = [("Curah Hujan (mm)", "line"), ("Suhu (°C)", "line"), ("Kelembapan (%)", "line")]
+
+
+def kirim(fig):
+    # Langkah yang sama dengan st.plotly_chart: ubah ke dict lalu serialisasi spec
+    spec = plotly.tools.return_figure_from_figure_or_data(fig, validate_figure=True)
+    return plotly.io.to_json(spec, validate=False)
+
+
+def ukur(nama, fungsi, ulang=5):
+    mulai = time.perf_counter()
+    for _ in range(ulang):
+        hasil = fungsi()
+    durasi = (time.perf_counter() - mulai) / ulang * 1000
+    print(f"{nama:<40} {len(hasil) / 1024:>10.1f} KB {durasi:>10.1f} ms")
+
+
+def lama():
+    # Cara lama: satu figur plotly.express per kolom, masing-masing lewat st.plotly_chart
+    return "".join(
+        kirim(px.line(df_jam, x="Waktu", y=kolom, title=kolom)) for kolom, _ in PANEL
+    )
+
+
+print(f"{len(df_jam)} baris per jam ({HARI} hari)")
+ukur("Figur terpisah (px.line)", lama)
+ukur("Multi-panel tanpa cache", lambda: kirim(buat_figur(df_jam, "Waktu", PANEL)))
+_figur_tersimpan.clear()
+ukur("Multi-panel (cache dingin)", lambda: kirim(figur(df_jam, "Waktu", PANEL)), ulang=1)
+ukur("Multi-panel (cache hangat)", lambda: kirim(figur(df_jam, "Waktu", PANEL)))
+rentang = (waktu[24 * 30], waktu[24 * 37])
+ukur("Multi-panel zoom 7 hari", lambda: kirim(buat_figur(df_jam, "Waktu", PANEL, rentang=rentang)))
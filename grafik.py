@@ -0,0 +1,145 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+from plotly.subplots import make_subplots
+
+# ------------------ KONFIGURASI GRAFIK ------------------
+# Jumlah titik per panel yang masih nyaman dibaca pada layar lebar
+TITIK_DASAR = 1500
+# Di atas jumlah ini trace garis digambar dengan WebGL (scattergl)
+AMBANG_WEBGL = 1000
+# Jumlah figur yang disimpan di cache
+MAKS_CACHE = 32
+
+
+# ------------------ DOWNSAMPLING ------------------
+def _ke_angka(x):
+    # Tanggal diubah ke nanodetik agar bisa dihitung luas segitiganya
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb(x, y, target):
+    """Largest-Triangle-Three-Buckets: kembalikan indeks titik yang dipertahankan."""
+    n = len(y)
+    if target >= n or target < 3:
+        return np.arange(n)
+
+    xa = _ke_angka(x)
+    ya = np.asarray(y, dtype=float)
+    batas = np.linspace(1, n - 1, target - 1).astype(int)
+
+    indeks = np.empty(target, dtype=int)
+    indeks[0] = 0
+    indeks[-1] = n - 1
+    a = 0
+    for i in range(target - 2):
+        awal, akhir = batas[i], batas[i + 1]
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        awal_next, akhir_next = batas[i + 1], batas[i + 2] if i + 2 < len(batas) else n
+        rx = xa[awal_next:akhir_next].mean()
+        ry = ya[awal_next:akhir_next].mean()
+
+        luas = np.abs(
+            (xa[a] - rx) * (ya[awal:akhir] - ya[a])
+            - (xa[a] - xa[awal:akhir]) * (ry - ya[a])
+        )
+        a = awal + int(np.argmax(luas))
+        indeks[i + 1] = a
+    return indeks
+
+
+def minmax(y, target):
+    """Ambil titik minimum dan maksimum tiap bucket (cocok untuk curah hujan/puncak)."""
+    n = len(y)
+    if target >= n or target < 2:
+        return np.arange(n)
+
+    ya = np.asarray(y, dtype=float)
+    batas = np.linspace(0, n, target // 2 + 1).astype(int)
+    indeks = []
+    for awal, akhir in zip(batas[:-1], batas[1:]):
+        if akhir <= awal:
+            continue
+        potong = ya[awal:akhir]
+        indeks.append(awal + int(np.argmin(potong)))
+        indeks.append(awal + int(np.argmax(potong)))
+    return np.unique(indeks)
+
+
+def titik_target(jumlah_terlihat, dasar=TITIK_DASAR):
+    # Data yang sudah dipotong sesuai rentang zoom selalu diberi anggaran titik
+    # yang sama, sehingga makin sempit rentang makin rapat detailnya.
+    return min(jumlah_terlihat, dasar)
+
+
+def turunkan_sampel(df, kolom_x, kolom_y, target, metode="lttb"):
+    data = df[[kolom_x, kolom_y]].dropna()
+    if len(data) <= target:
+        return data
+    if metode == "minmax":
+        indeks = minmax(data[kolom_y].values, target)
+    else:
+        indeks = lttb(data[kolom_x].values, data[kolom_y].values, target)
+    return data.iloc[indeks]
+
+
+# ------------------ FIGUR MULTI-PANEL ------------------
+def kunci_data(df, *parameter):
+    h = hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(repr(parameter).encode("utf-8"))
+    return h.hexdigest()
+
+
+def buat_figur(df, kolom_x, panel, judul="", rentang=None, dasar=TITIK_DASAR):
+    """
+    Satu figur dengan beberapa panel ber-sumbu-x sama.
+    panel: list tuple (kolom, jenis) dengan jenis "bar" atau "line".
+    Panel "line" di atas AMBANG_WEBGL titik digambar dengan scattergl.
+    rentang: (awal, akhir) nilai x yang sedang di-zoom, None berarti semua data.
+    """
+    if rentang is not None:
+        df = df[(df[kolom_x] >= rentang[0]) & (df[kolom_x] <= rentang[1])]
+
+    fig = make_subplots(
+        rows=len(panel), cols=1, shared_xaxes=True,
+        vertical_spacing=0.04, subplot_titles=[kolom for kolom, _ in panel]
+    )
+    target = titik_target(len(df), dasar)
+    for baris, (kolom, jenis) in enumerate(panel, start=1):
+        metode = "minmax" if jenis == "bar" else "lttb"
+        data = turunkan_sampel(df, kolom_x, kolom, target, metode)
+        x, y = data[kolom_x], data[kolom]
+
+        # Panel batang tetap go.Bar; min/max sudah membatasi jumlah batangnya
+        if jenis == "bar":
+            trace = go.Bar(x=x, y=y, name=kolom)
+        elif len(data) > AMBANG_WEBGL:
+            trace = go.Scattergl(x=x, y=y, name=kolom, mode="lines")
+        else:
+            trace = go.Scatter(x=x, y=y, name=kolom, mode="lines")
+        fig.add_trace(trace, row=baris, col=1)
+
+    fig.update_layout(
+        title=judul, showlegend=False, hovermode="x unified",
+        height=220 * len(panel) + 80, margin=dict(l=40, r=20, t=80, b=40)
+    )
+    return fig
+
+
+# Figur jadi disimpan lewat cache Streamlit (aman dipakai banyak sesi) dengan
+# kunci hash data. Objek Figure dikirim langsung ke st.plotly_chart sehingga
+# tidak divalidasi ulang seperti kalau yang dikirim berupa dict.
+@st.cache_resource(max_entries=MAKS_CACHE, show_spinner=False)
+def _figur_tersimpan(kunci, _df, _kolom_x, _panel, _judul, _rentang, _dasar):
+    return buat_figur(_df, _kolom_x, _panel, _judul, _rentang, _dasar)
+
+
+def figur(df, kolom_x, panel, judul="", rentang=None, dasar=TITIK_DASAR):
+    kunci = kunci_data(df, kolom_x, panel, judul, rentang, dasar)
+    return _figur_tersimpan(kunci, df, kolom_x, panel, judul, rentang, dasar)
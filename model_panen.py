@@ -0,0 +1,242 @@
+import copy
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDRegressor
+from sklearn.preprocessing import StandardScaler
+
+# ------------------ KONFIGURASI MODEL PANEN ------------------
+RIWAYAT_PANEN_FILE = "data/riwayat_panen.csv"
+# Hash isi file yang sudah masuk riwayat, supaya upload yang sama tidak dobel
+HASH_RIWAYAT_FILE = "data/riwayat_panen_hash.json"
+MODEL_DIR = "data/model_panen"
+DAFTAR_MODEL_FILE = os.path.join(MODEL_DIR, "daftar.json")
+
+KOLOM_FITUR = ["Curah Hujan (mm)", "Suhu (°C)", "Kelembapan (%)"]
+KOLOM_TARGET = "Hasil Panen (kg/ha)"
+# Nama kolom lain yang juga diterima dari CSV petani
+ALIAS_KOLOM = {"Suhu Maks (°C)": "Suhu (°C)"}
+
+UKURAN_BATCH = 256
+# Persentase baris (berdasarkan hash isi baris) yang disisihkan untuk uji
+PERSEN_HOLDOUT = 20
+
+
+# ------------------ BACA DATA PANEN ------------------
+def baca_batch(sumber, ukuran_batch=UKURAN_BATCH):
+    # Data dibaca per potongan, jadi riwayat banyak musim tidak dimuat sekaligus
+    if hasattr(sumber, "seek"):
+        sumber.seek(0)
+    for batch in pd.read_csv(sumber, chunksize=ukuran_batch, float_precision="round_trip"):
+        batch = batch.rename(columns=ALIAS_KOLOM)
+        kurang = [k for k in KOLOM_FITUR + [KOLOM_TARGET] if k not in batch.columns]
+        if kurang:
+            raise ValueError(f"Kolom tidak ditemukan di CSV: {', '.join(kurang)}")
+        batch = batch[KOLOM_FITUR + [KOLOM_TARGET]].apply(pd.to_numeric, errors="coerce").dropna()
+        if not batch.empty:
+            yield batch
+
+
+def pisah_holdout(batch):
+    # Pembagian berdasarkan hash baris sehingga tetap sama di setiap pembacaan.
+    # Di-hash sebagai float64 karena baris yang sama bisa terbaca int64 di CSV
+    # upload dan float64 di riwayat (tercampur dengan baris desimal).
+    kunci = batch[KOLOM_FITUR + [KOLOM_TARGET]].astype("float64")
+    uji = pd.util.hash_pandas_object(kunci, index=False).values % 100 < PERSEN_HOLDOUT
+    return batch[~uji], batch[uji]
+
+
+def hash_isi(sumber):
+    if hasattr(sumber, "getvalue"):
+        isi = sumber.getvalue()
+    else:
+        with open(sumber, "rb") as f:
+            isi = f.read()
+    return hashlib.sha1(isi).hexdigest()
+
+
+def hash_tersimpan():
+    if os.path.exists(HASH_RIWAYAT_FILE):
+        with open(HASH_RIWAYAT_FILE, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                pass
+    return []
+
+
+def simpan_riwayat(sumber, kode=None):
+    # Tambahkan catatan panen baru ke riwayat tanpa membaca isi riwayat lama
+    folder = os.path.dirname(RIWAYAT_PANEN_FILE)
+    if not os.path.exists(folder):
+        os.makedirs(folder)
+
+    ada = os.path.exists(RIWAYAT_PANEN_FILE)
+    jumlah = 0
+    for batch in baca_batch(sumber):
+        batch.to_csv(RIWAYAT_PANEN_FILE, mode="a", header=not ada, index=False)
+        ada = True
+        jumlah += len(batch)
+
+    daftar_hash = hash_tersimpan()
+    daftar_hash.append(kode or hash_isi(sumber))
+    with open(HASH_RIWAYAT_FILE, "w", encoding="utf-8") as f:
+        json.dump(daftar_hash, f, indent=2)
+    return jumlah
+
+
+# ------------------ LATIH & EVALUASI ------------------
+def model_baru():
+    return {
+        "versi": 0,
+        "scaler_x": StandardScaler(),
+        "scaler_y": StandardScaler(),
+        "model": SGDRegressor(learning_rate="invscaling", eta0=0.01, random_state=42),
+        "jumlah_data": 0,
+    }
+
+
+def prediksi_panen(snapshot, X):
+    X = snapshot["scaler_x"].transform(np.asarray(X, dtype=float))
+    y = snapshot["model"].predict(X).reshape(-1, 1)
+    return snapshot["scaler_y"].inverse_transform(y).ravel()
+
+
+def evaluasi_banyak(snapshot_semua, sumber):
+    # Satu kali baca data uji untuk menilai semua snapshot sekaligus
+    n = 0
+    total_abs = np.zeros(len(snapshot_semua))
+    total_kuadrat = np.zeros(len(snapshot_semua))
+    for batch in baca_batch(sumber):
+        _, uji = pisah_holdout(batch)
+        if uji.empty:
+            continue
+        n += len(uji)
+        for i, snapshot in enumerate(snapshot_semua):
+            galat = prediksi_panen(snapshot, uji[KOLOM_FITUR].values) - uji[KOLOM_TARGET].values
+            total_abs[i] += np.abs(galat).sum()
+            total_kuadrat[i] += (galat ** 2).sum()
+    if n == 0:
+        return [{"MAE (kg/ha)": None, "RMSE (kg/ha)": None, "Data Uji": 0} for _ in snapshot_semua]
+    return [
+        {
+            "MAE (kg/ha)": round(float(total_abs[i] / n), 1),
+            "RMSE (kg/ha)": round(float(np.sqrt(total_kuadrat[i] / n)), 1),
+            "Data Uji": n,
+        }
+        for i in range(len(snapshot_semua))
+    ]
+
+
+def evaluasi(snapshot, sumber):
+    return evaluasi_banyak([snapshot], sumber)[0]
+
+
+def info_riwayat():
+    # Ukuran dan waktu ubah riwayat, dipakai sebagai kunci cache metrik
+    if not os.path.exists(RIWAYAT_PANEN_FILE):
+        return None
+    stat = os.stat(RIWAYAT_PANEN_FILE)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def latih_inkremental(sumber, snapshot_dasar=None, epoch=5):
+    """
+    Lanjutkan pelatihan dari snapshot_dasar (atau model baru) memakai data
+    dari sumber yang dibaca per mini-batch. Mengembalikan snapshot baru
+    (tanpa metrik) yang belum disimpan.
+    """
+    snapshot = copy.deepcopy(snapshot_dasar) if snapshot_dasar else model_baru()
+
+    # Scaler hanya di-fit saat melatih dari awal. Bobot SGD snapshot dasar
+    # dipelajari pada skala lama, jadi skalanya dibekukan saat melanjutkan.
+    jumlah_baru = 0
+    for batch in baca_batch(sumber):
+        latih, _ = pisah_holdout(batch)
+        if latih.empty:
+            continue
+        if snapshot_dasar is None:
+            snapshot["scaler_x"].partial_fit(latih[KOLOM_FITUR].values)
+            snapshot["scaler_y"].partial_fit(latih[[KOLOM_TARGET]].values)
+        jumlah_baru += len(latih)
+
+    if jumlah_baru == 0:
+        raise ValueError("Tidak ada data latih yang valid di CSV.")
+    snapshot["jumlah_data"] += jumlah_baru
+
+    for _ in range(epoch):
+        for batch in baca_batch(sumber):
+            latih, _ = pisah_holdout(batch)
+            if latih.empty:
+                continue
+            X = snapshot["scaler_x"].transform(latih[KOLOM_FITUR].values)
+            y = snapshot["scaler_y"].transform(latih[[KOLOM_TARGET]].values).ravel()
+            snapshot["model"].partial_fit(X, y)
+    return snapshot
+
+
+def latih_dari_upload(sumber, snapshot_dasar=None):
+    kode = hash_isi(sumber)
+    if kode in hash_tersimpan():
+        raise ValueError("File ini sudah pernah dimasukkan ke riwayat panen.")
+
+    # Riwayat baru diubah setelah pelatihan berhasil, lalu metrik dihitung
+    # dari data uji riwayat yang sudah memuat catatan baru
+    snapshot = latih_inkremental(sumber, snapshot_dasar)
+    simpan_riwayat(sumber, kode)
+    snapshot["metrik"] = evaluasi(snapshot, RIWAYAT_PANEN_FILE)
+    return snapshot
+
+
+def latih_ulang_riwayat():
+    if not os.path.exists(RIWAYAT_PANEN_FILE):
+        raise ValueError("Belum ada riwayat panen. Upload CSV catatan panen terlebih dahulu.")
+    snapshot = latih_inkremental(RIWAYAT_PANEN_FILE)
+    snapshot["metrik"] = evaluasi(snapshot, RIWAYAT_PANEN_FILE)
+    return snapshot
+
+
+# ------------------ SNAPSHOT MODEL ------------------
+def daftar_snapshot():
+    if os.path.exists(DAFTAR_MODEL_FILE):
+        with open(DAFTAR_MODEL_FILE, "r", encoding="utf-8") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                pass
+    return []
+
+
+def path_snapshot(versi):
+    return os.path.join(MODEL_DIR, f"panen_v{versi:03d}.pkl")
+
+
+def simpan_snapshot(snapshot, sumber_data):
+    if not os.path.exists(MODEL_DIR):
+        os.makedirs(MODEL_DIR)
+
+    daftar = daftar_snapshot()
+    snapshot = dict(snapshot, versi=max((d["Versi"] for d in daftar), default=0) + 1)
+    with open(path_snapshot(snapshot["versi"]), "wb") as f:
+        pickle.dump(snapshot, f)
+
+    daftar.append({
+        "Versi": snapshot["versi"],
+        "Waktu": datetime.now().strftime("%d %B %Y %H:%M"),
+        "Sumber": sumber_data,
+        "Jumlah Data Latih": snapshot["jumlah_data"],
+        **snapshot["metrik"],
+    })
+    with open(DAFTAR_MODEL_FILE, "w", encoding="utf-8") as f:
+        json.dump(daftar, f, ensure_ascii=False, indent=2)
+    return snapshot["versi"]
+
+
+def muat_snapshot(versi):
+    with open(path_snapshot(versi), "rb") as f:
+        return pickle.load(f)
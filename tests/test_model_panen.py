@@ -0,0 +1,98 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import model_panen as mp
+
+
+@pytest.fixture(autouse=True)
+def riwayat_sementara(tmp_path, monkeypatch):
+    monkeypatch.setattr(mp, "RIWAYAT_PANEN_FILE", str(tmp_path / "data" / "riwayat_panen.csv"))
+    monkeypatch.setattr(mp, "HASH_RIWAYAT_FILE", str(tmp_path / "data" / "riwayat_panen_hash.json"))
+    monkeypatch.setattr(mp, "MODEL_DIR", str(tmp_path / "data" / "model_panen"))
+    monkeypatch.setattr(mp, "DAFTAR_MODEL_FILE", str(tmp_path / "data" / "model_panen" / "daftar.json"))
+
+
+def buat_csv(df):
+    return io.BytesIO(df.to_csv(index=False).encode("utf-8"))
+
+
+def data_panen(n, seed=0, bulat=False):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Curah Hujan (mm)": rng.uniform(0, 10, n),
+        "Suhu (°C)": rng.uniform(27, 34, n),
+        "Kelembapan (%)": rng.uniform(70, 90, n),
+    })
+    df["Hasil Panen (kg/ha)"] = (
+        4000 + 120 * df["Curah Hujan (mm)"] - 30 * df["Suhu (°C)"]
+        + 10 * df["Kelembapan (%)"] + rng.normal(0, 50, n)
+    )
+    if bulat:
+        df = df.round().astype(int)
+    return df
+
+
+def baris(frames):
+    return {tuple(r) for df in frames for r in df.astype("float64").itertuples(index=False)}
+
+
+def test_holdout_upload_bulat_sama_dengan_di_riwayat():
+    mp.simpan_riwayat(buat_csv(data_panen(10, seed=1)))
+    upload = buat_csv(data_panen(40, seed=2, bulat=True))
+
+    latih_upload = baris(mp.pisah_holdout(b)[0] for b in mp.baca_batch(upload))
+    mp.simpan_riwayat(upload)
+    uji_riwayat = baris(mp.pisah_holdout(b)[1] for b in mp.baca_batch(mp.RIWAYAT_PANEN_FILE))
+
+    assert uji_riwayat
+    assert not latih_upload & uji_riwayat
+
+
+def test_lanjut_latih_tidak_mengubah_scaler_dasar():
+    data = data_panen(500, seed=3)
+    mp.simpan_riwayat(buat_csv(data))
+    v1 = mp.latih_inkremental(mp.RIWAYAT_PANEN_FILE)
+
+    # Upload kecil dengan sebaran jauh berbeda tidak boleh menggeser skala v1
+    kecil = data_panen(12, seed=4)
+    kecil["Curah Hujan (mm)"] += 50
+    v2 = mp.latih_inkremental(buat_csv(kecil), v1)
+
+    np.testing.assert_array_equal(v2["scaler_x"].mean_, v1["scaler_x"].mean_)
+    np.testing.assert_array_equal(v2["scaler_y"].scale_, v1["scaler_y"].scale_)
+    assert v2["jumlah_data"] > v1["jumlah_data"]
+
+
+def test_upload_sama_tidak_masuk_riwayat_dua_kali():
+    upload = buat_csv(data_panen(50, seed=5))
+    v1 = mp.latih_dari_upload(upload)
+    ukuran = len(pd.read_csv(mp.RIWAYAT_PANEN_FILE))
+
+    with pytest.raises(ValueError):
+        mp.latih_dari_upload(upload, v1)
+    assert len(pd.read_csv(mp.RIWAYAT_PANEN_FILE)) == ukuran
+
+
+def test_pelatihan_gagal_tidak_mengubah_riwayat():
+    # Cari satu baris yang jatuh ke data uji sehingga tidak ada data latih
+    data = data_panen(50, seed=6)
+    uji = mp.pisah_holdout(data)[1].head(1)
+
+    with pytest.raises(ValueError):
+        mp.latih_dari_upload(buat_csv(uji))
+    assert not os.path.exists(mp.RIWAYAT_PANEN_FILE)
+    assert mp.hash_tersimpan() == []
+
+
+def test_semua_versi_dinilai_pada_data_uji_yang_sama():
+    v1 = mp.latih_dari_upload(buat_csv(data_panen(200, seed=7)))
+    v2 = mp.latih_dari_upload(buat_csv(data_panen(200, seed=8)), v1)
+
+    metrik = mp.evaluasi_banyak([v1, v2], mp.RIWAYAT_PANEN_FILE)
+    assert metrik[0]["Data Uji"] == metrik[1]["Data Uji"] == v2["metrik"]["Data Uji"]
+    assert metrik[0]["Data Uji"] > v1["metrik"]["Data Uji"]
+    assert metrik[1] == mp.evaluasi(v2, mp.RIWAYAT_PANEN_FILE)